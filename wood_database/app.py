@@ -10,8 +10,12 @@ from flask_migrate import Migrate
 from flask_smorest import Api
 from load_dotenv import load_dotenv
 
+from compress import compress
 from db import db
+from resources.fitting import blp as fitting_blueprint
+from resources.placement import blp as placement_blueprint
 from resources.wood import blp as wood_blueprint
+from snapshot import inventory
 
 
 def create_app(db_url=None):
@@ -30,13 +34,18 @@ def create_app(db_url=None):
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
     db.init_app(app)
+    inventory.init_app(app)
+    compress.init_app(app)
     migrate = Migrate(app, db)
     api = Api(app)
 
     @app.before_first_request
     def create_tables():
         db.create_all()
+        inventory.sync()
 
     api.register_blueprint(wood_blueprint)
+    api.register_blueprint(placement_blueprint)
+    api.register_blueprint(fitting_blueprint)
 
     return app
@@ -0,0 +1,108 @@
+"""
+__Author__ Javid Jooshesh, j.jooshesh@hva.nl
+_Bounded LRU cache for the results of the fitting functions_
+"""
+
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """_Least recently used cache bounded by entries and stored values_
+
+    Attributes:
+        max_entries (int) : The maximum number of cached results
+        max_size (int) : The maximum number of values over all cached results
+        hits (int) : The number of lookups answered from the cache
+        misses (int) : The number of lookups that had to be computed
+    """
+
+    def __init__(self, max_entries=256, max_size=100000):
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Return the cached result for `key` or None"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Store a result, evicting the least recently used ones to stay
+        within the limits. Results larger than `max_size` are not stored"""
+        if len(value) > self.max_size:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.size -= len(self._entries.pop(key))
+            self._entries[key] = value
+            self.size += len(value)
+            while len(self._entries) > self.max_entries or self.size > self.max_size:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "size": self.size,
+            }
+
+
+def make_key(*parts):
+    """Hash the arguments of a call into a short cache key"""
+    return hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+
+def memoize(cache, key=None):
+    """Cache the list results of a function keyed by a hash of its arguments.
+
+    Args:
+        cache (LRUCache) : Where the results are kept
+        key (callable) : Takes the call arguments and returns what the result
+            depends on, e.g. the requested parts and the inventory version,
+            or None to skip the cache for that call. By default all the
+            arguments are hashed
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if key is None:
+                parts = (args, sorted(kwargs.items()))
+            else:
+                parts = key(*args, **kwargs)
+                if parts is None:
+                    return func(*args, **kwargs)
+            cache_key = make_key(func.__qualname__, parts)
+            result = cache.get(cache_key)
+            if result is None:
+                result = tuple(func(*args, **kwargs))
+                cache.put(cache_key, result)
+            return list(result)
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
@@ -0,0 +1,77 @@
+"""
+__Author__ Javid Jooshesh, j.jooshesh@hva.nl
+_Parsing and conversion of the scanned wood colors_
+"""
+
+import math
+
+# D65 reference white used for the sRGB -> XYZ -> CIELAB conversion
+_WHITE_X = 0.95047
+_WHITE_Y = 1.00000
+_WHITE_Z = 1.08883
+
+
+def parse_rgb(color):
+    """Parse a color string such as `"180, 200, 119"` into an (r, g, b) tuple.
+    Grasshopper writes translucent colors as `"a, r, g, b"`, the alpha is dropped
+
+    Raises ValueError when the string does not hold three channels in 0-255
+    """
+    values = [float(c) for c in color.split(",")]
+    if not all(math.isfinite(v) for v in values):
+        raise ValueError("color channels must be finite numbers")
+    channels = [int(round(v)) for v in values]
+    if len(channels) == 4:
+        channels = channels[1:]
+    if len(channels) != 3:
+        raise ValueError("color must have three or four channels, got %d" % len(channels))
+    for c in channels:
+        if not 0 <= c <= 255:
+            raise ValueError("color channel %d is out of range 0-255" % c)
+    return tuple(channels)
+
+
+def pack_rgb(r, g, b):
+    """Pack the three channels into a single 24 bit integer"""
+    return (r << 16) | (g << 8) | b
+
+
+def unpack_rgb(packed):
+    return (packed >> 16) & 0xFF, (packed >> 8) & 0xFF, packed & 0xFF
+
+
+def _linearize(channel):
+    c = channel / 255.0
+    if c <= 0.04045:
+        return c / 12.92
+    return ((c + 0.055) / 1.055) ** 2.4
+
+
+def _lab_f(t):
+    if t > 216.0 / 24389.0:
+        return t ** (1.0 / 3.0)
+    return (24389.0 / 27.0 * t + 16.0) / 116.0
+
+
+def rgb_to_lab(r, g, b):
+    """Convert sRGB channels to the perceptual CIELAB space (D65)"""
+    rl, gl, bl = _linearize(r), _linearize(g), _linearize(b)
+
+    x = (0.4124564 * rl + 0.3575761 * gl + 0.1804375 * bl) / _WHITE_X
+    y = (0.2126729 * rl + 0.7151522 * gl + 0.0721750 * bl) / _WHITE_Y
+    z = (0.0193339 * rl + 0.1191920 * gl + 0.9503041 * bl) / _WHITE_Z
+
+    fx, fy, fz = _lab_f(x), _lab_f(y), _lab_f(z)
+    return 116.0 * fy - 16.0, 500.0 * (fx - fy), 200.0 * (fy - fz)
+
+
+def color_columns(color):
+    """Return the stored color columns of a wood model for a color string"""
+    r, g, b = parse_rgb(color)
+    lab_l, lab_a, lab_b = rgb_to_lab(r, g, b)
+    return {
+        "color_rgb": pack_rgb(r, g, b),
+        "color_l": lab_l,
+        "color_a": lab_a,
+        "color_b": lab_b,
+    }
@@ -0,0 +1,68 @@
+"""
+__Author__ Javid Jooshesh, j.jooshesh@hva.nl
+_Content-negotiated compression of the large API responses_
+"""
+
+import gzip
+
+from flask import request
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class Compress:
+    """_Compress JSON responses above a size threshold with zstd or gzip,
+    whichever the client accepts. zstd is only offered when the optional
+    `zstandard` package is installed_
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+        app.config.setdefault('COMPRESS_GZIP_LEVEL', 5)
+        app.config.setdefault('COMPRESS_ZSTD_LEVEL', 3)
+        self.app = app
+        app.after_request(self.after_request)
+
+    @staticmethod
+    def choose_encoding():
+        accept = request.accept_encodings
+        if zstandard is not None and accept['zstd']:
+            return 'zstd'
+        if accept['gzip']:
+            return 'gzip'
+        return None
+
+    def after_request(self, response):
+        if (
+            response.status_code != 200
+            or response.direct_passthrough
+            or response.mimetype != 'application/json'
+            or 'Content-Encoding' in response.headers
+        ):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        data = response.get_data()
+        if len(data) < self.app.config['COMPRESS_MIN_SIZE']:
+            return response
+
+        encoding = self.choose_encoding()
+        if encoding == 'zstd':
+            compressor = zstandard.ZstdCompressor(level=self.app.config['COMPRESS_ZSTD_LEVEL'])
+            response.set_data(compressor.compress(data))
+        elif encoding == 'gzip':
+            response.set_data(gzip.compress(data, compresslevel=self.app.config['COMPRESS_GZIP_LEVEL']))
+        else:
+            return response
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+
+compress = Compress()
@@ -3,11 +3,31 @@ __Author__ Javid Jooshesh, j.jooshesh@hva.nl
 _A function to search the from a list to look for closest members_
 """
 
+from cache import LRUCache, memoize
+
+# Results of `search` keyed by the requested parts and the inventory version
+fit_cache = LRUCache(max_entries=512, max_size=200000)
+
+
 def find_nearest(array, value):
     return array[min(range(len(array)), key=lambda i: abs(array[i] - value))]
 
 
-def search(base_array, array_to_search_from):
+def _search_key(base_array, array_to_search_from, inventory_version=None):
+    if inventory_version is None:
+        return None
+    return tuple(base_array), inventory_version
+
+
+@memoize(fit_cache, key=_search_key)
+def search(base_array, array_to_search_from, inventory_version=None):
+    """Pick the closest members of `array_to_search_from` for `base_array`.
+
+    Results are cached on the requested values and `inventory_version`,
+    e.g. `inventory.version(table)` when the list comes from the snapshot.
+    Without a version the inventory cannot be told apart cheaply, so the
+    call is not cached
+    """
     found_closest_values = []
     hashset = set()
 
@@ -0,0 +1,39 @@
+"""
+__Author__ Javid Jooshesh, j.jooshesh@hva.nl
+_Axis-aligned box geometry of the wood planks for the Grasshopper clients_
+"""
+
+import numpy as np
+
+# Corners of the unit box, the bottom face counter-clockwise first as
+# `rs.AddBox` expects. x runs along the length, y the width, z the height
+UNIT_VERTICES = np.array([
+    [0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0],
+    [0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1],
+], dtype=np.float64)
+
+# Vertex index pairs of the 12 box edges
+EDGES = np.array([
+    [0, 1], [1, 2], [2, 3], [3, 0],
+    [4, 5], [5, 6], [6, 7], [7, 4],
+    [0, 4], [1, 5], [2, 6], [3, 7],
+])
+
+
+def box_geometry(length, width, height):
+    """Compute the boxes of many planks at once
+
+    Args:
+        length, width, height (array_like) : The plank dimensions, shape (n,)
+    Returns:
+        vertices (ndarray) : Shape (n, 24), the 8 corners as x, y, z
+        edges (ndarray) : Shape (n, 72), start and end point of the 12 edges
+
+    The edge lengths are not returned, they are the three dimensions four
+    times each
+    """
+    dims = np.column_stack([length, width, height]).astype(np.float64)
+    n = len(dims)
+    vertices = dims[:, None, :] * UNIT_VERTICES
+    edges = vertices[:, EDGES]
+    return vertices.reshape(n, 24), edges.reshape(n, 72)
@@ -0,0 +1,50 @@
+"""
+__Author__ Javid Jooshesh, j.jooshesh@hva.nl
+_Matching of design parts to the planks of the inventory snapshot_
+"""
+
+import numpy as np
+
+from cache import LRUCache, memoize
+from snapshot import inventory
+
+# Results of `match_inventory` keyed by the parts and the inventory version
+match_cache = LRUCache(max_entries=512, max_size=200000)
+
+
+def _match_key(table, parts):
+    return table, parts, inventory.version(table)
+
+
+@memoize(match_cache, key=_match_key)
+def match_inventory(table, parts):
+    """Match each part to the unused plank of the inventory snapshot that
+    fits its length, width and height with the least volume to spare
+
+    Args:
+        table (str) : The wood table to match from
+        parts (tuple) : (length, width, height) tuples in matching order
+    Returns:
+        ids (list) : The matched plank id per part, None when nothing fits
+    Raises:
+        RuntimeError : When the table has no snapshot to match from
+    """
+    columns = inventory.columns(table)
+    if columns is None:
+        raise RuntimeError("No inventory snapshot of %s to match from" % table)
+    ids = columns['id']
+    dims = np.stack([columns['length'], columns['width'], columns['height']])
+    volume = dims.prod(axis=0)
+    used = np.zeros(len(ids), dtype=bool)
+
+    matched = []
+    for length, width, height in parts:
+        fits = ~used & (dims[0] >= length) & (dims[1] >= width) & (dims[2] >= height)
+        candidates = np.flatnonzero(fits)
+        if not len(candidates):
+            matched.append(None)
+            continue
+        best = candidates[np.argmin(volume[candidates])]
+        used[best] = True
+        matched.append(int(ids[best]))
+    return matched
@@ -0,0 +1,27 @@
+"""
+__Author__ Javid Jooshesh, j.jooshesh@hva.nl
+_Derived metrics of the wood planks computed once on insert_
+"""
+
+# The scanners store `density` as 1e4 * weight / (length * width * height)
+DENSITY_SCALE = 10000.0
+
+
+def derived_columns(length, width, height, weight, density):
+    """Return the stored derived columns of a wood model
+
+    `computed_density` is recomputed from the dimensions and weight in the
+    units of the stored `density`, and `density_ratio` divides the two, so
+    1.0 means the scanned values agree. The ratios are left empty when the
+    plank has a zero dimension or density
+    """
+    volume = length * width * height
+    thickness = min(width, height)
+    computed_density = DENSITY_SCALE * weight / volume if volume else None
+    return {
+        "volume": volume,
+        "computed_density": computed_density,
+        "density_ratio": computed_density / density if computed_density is not None and density else None,
+        "aspect_ratio": width / height if height else None,
+        "slenderness": length / thickness if thickness else None,
+    }
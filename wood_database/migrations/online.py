@@ -0,0 +1,97 @@
+"""
+__Author__ Javid Jooshesh, j.jooshesh@hva.nl
+_Migration helpers that evolve the wood tables without rewriting or
+locking them, so the scanners can keep writing during an upgrade_
+"""
+
+import logging
+
+import sqlalchemy as sa
+from alembic import op
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+
+def has_column(table_name, column_name):
+    columns = sa.inspect(op.get_bind()).get_columns(table_name)
+    return any(column['name'] == column_name for column in columns)
+
+
+def has_index(table_name, index_name):
+    indexes = sa.inspect(op.get_bind()).get_indexes(table_name)
+    return any(index['name'] == index_name for index in indexes)
+
+
+def add_column(table_name, column):
+    """Add a nullable column with a plain `ALTER TABLE ... ADD COLUMN`,
+    which SQLite and PostgreSQL apply without copying the table. Columns
+    that already exist are skipped so an interrupted upgrade can be rerun
+    """
+    if not column.nullable or column.server_default is not None:
+        raise ValueError("online columns must be nullable without a server default: %s" % column.name)
+    if not has_column(table_name, column.name):
+        op.add_column(table_name, column)
+
+
+def create_index(index_name, table_name, columns):
+    """Create an index unless it exists, concurrently on PostgreSQL so the
+    table stays writable while it is built"""
+    if has_index(table_name, index_name):
+        return
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.create_index(index_name, table_name, columns, postgresql_concurrently=True)
+    else:
+        op.create_index(index_name, table_name, columns)
+
+
+def backfill(table_name, source_columns, target_columns, compute, chunk_size=1000):
+    """Fill `target_columns` from `source_columns` in chunks of `chunk_size`
+    rows, each chunk in its own short transaction.
+
+    Only rows whose first target column is still NULL are visited, in
+    primary key order, so a rerun picks up where an interrupted one stopped
+    and rows inserted meanwhile with the values set are left alone.
+
+    Args:
+        compute (callable) : Takes a row with the `source_columns` and
+            returns a dict of the target values, or None to leave the row
+    """
+    table = sa.table(
+        table_name,
+        sa.column('id', sa.Integer),
+        *[sa.column(name) for name in tuple(source_columns) + tuple(target_columns)]
+    )
+    pending = table.c[target_columns[0]].is_(None)
+    update = table.update().where(table.c.id == sa.bindparam('_id')).values(
+        {name: sa.bindparam('_' + name) for name in target_columns}
+    )
+    # The chunks run on their own connections once the migration transaction
+    # is committed, so the added columns are not locked for the whole backfill
+    engine = op.get_bind().engine
+
+    with op.get_context().autocommit_block():
+        with engine.connect() as connection:
+            total = connection.execute(
+                sa.select(sa.func.count()).select_from(table).where(pending)
+            ).scalar()
+        done, last_id = 0, None
+        while True:
+            query = sa.select(table.c.id, *[table.c[name] for name in source_columns]).where(pending)
+            if last_id is not None:
+                query = query.where(table.c.id > last_id)
+            with engine.begin() as connection:
+                rows = connection.execute(query.order_by(table.c.id).limit(chunk_size)).fetchall()
+                if not rows:
+                    break
+                values = []
+                for row in rows:
+                    computed = compute(row)
+                    if computed is not None:
+                        values.append(dict({'_' + k: v for k, v in computed.items()}, _id=row.id))
+                if values:
+                    connection.execute(update, values)
+
+            done += len(rows)
+            last_id = rows[-1].id
+            logger.info("Backfilled %d/%d rows of %s", done, total, table_name)
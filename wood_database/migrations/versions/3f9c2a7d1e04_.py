@@ -0,0 +1,49 @@
+"""parsed color columns
+
+Revision ID: 3f9c2a7d1e04
+Revises: d0908af99bdb
+Create Date: 2026-10-19 10:12:41.503218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from color import color_columns
+from migrations.online import add_column, backfill, create_index
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c2a7d1e04'
+down_revision = 'd0908af99bdb'
+branch_labels = None
+depends_on = None
+
+TABLES = ('residual_wood', 'waste_wood')
+
+
+def compute_color(row):
+    try:
+        return color_columns(row.color)
+    except ValueError:
+        # Leave malformed legacy colors empty rather than failing the upgrade
+        return None
+
+
+def upgrade():
+    for table_name in TABLES:
+        add_column(table_name, sa.Column('color_rgb', sa.Integer(), nullable=True))
+        add_column(table_name, sa.Column('color_l', sa.Float(), nullable=True))
+        add_column(table_name, sa.Column('color_a', sa.Float(), nullable=True))
+        add_column(table_name, sa.Column('color_b', sa.Float(), nullable=True))
+        backfill(table_name, ('color',), ('color_l', 'color_a', 'color_b', 'color_rgb'), compute_color)
+        create_index('ix_%s_color_lab' % table_name, table_name, ['color_l', 'color_a', 'color_b'])
+
+
+def downgrade():
+    for table_name in TABLES:
+        op.drop_index('ix_%s_color_lab' % table_name, table_name=table_name)
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.drop_column('color_b')
+            batch_op.drop_column('color_a')
+            batch_op.drop_column('color_l')
+            batch_op.drop_column('color_rgb')
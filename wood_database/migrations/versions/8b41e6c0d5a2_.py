@@ -0,0 +1,44 @@
+"""derived metric columns
+
+Revision ID: 8b41e6c0d5a2
+Revises: 3f9c2a7d1e04
+Create Date: 2026-10-19 11:37:08.214690
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from metrics import derived_columns
+from migrations.online import add_column, backfill, create_index
+
+
+# revision identifiers, used by Alembic.
+revision = '8b41e6c0d5a2'
+down_revision = '3f9c2a7d1e04'
+branch_labels = None
+depends_on = None
+
+TABLES = ('residual_wood', 'waste_wood')
+COLUMNS = ('volume', 'computed_density', 'density_ratio', 'aspect_ratio', 'slenderness')
+
+
+def compute_metrics(row):
+    return derived_columns(row.length, row.width, row.height, row.weight, row.density)
+
+
+def upgrade():
+    for table_name in TABLES:
+        for name in COLUMNS:
+            add_column(table_name, sa.Column(name, sa.Float(), nullable=True))
+        backfill(table_name, ('length', 'width', 'height', 'weight', 'density'), COLUMNS, compute_metrics)
+        for name in COLUMNS:
+            create_index(op.f('ix_%s_%s' % (table_name, name)), table_name, [name])
+
+
+def downgrade():
+    for table_name in TABLES:
+        for name in COLUMNS:
+            op.drop_index(op.f('ix_%s_%s' % (table_name, name)), table_name=table_name)
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            for name in reversed(COLUMNS):
+                batch_op.drop_column(name)
@@ -3,7 +3,11 @@ __Author__ Javid Jooshesh, j.jooshesh@hva.nl
 _Database model for residaul and waste wood_
 """
 
+from sqlalchemy import event
+
+from color import color_columns
 from db import db
+from metrics import derived_columns
 
 
 class ResidualWoodModel(db.Model):
@@ -17,6 +21,19 @@ class ResidualWoodModel(db.Model):
     density = db.Column(db.Float(precision=2), nullable=False)
     timestamp = db.Column(db.String, nullable=False)
     color = db.Column(db.String(80), nullable=False)
+    color_rgb = db.Column(db.Integer)
+    color_l = db.Column(db.Float)
+    color_a = db.Column(db.Float)
+    color_b = db.Column(db.Float)
+    volume = db.Column(db.Float, index=True)
+    computed_density = db.Column(db.Float, index=True)
+    density_ratio = db.Column(db.Float, index=True)
+    aspect_ratio = db.Column(db.Float, index=True)
+    slenderness = db.Column(db.Float, index=True)
+
+    __table_args__ = (
+        db.Index('ix_residual_wood_color_lab', 'color_l', 'color_a', 'color_b'),
+    )
 
 
 class WasteWoodModel(db.Model):
@@ -30,7 +47,40 @@ class WasteWoodModel(db.Model):
     density = db.Column(db.Float(precision=2), nullable=False)
     timestamp = db.Column(db.String, nullable=False)
     color = db.Column(db.String(80), nullable=False)
+    color_rgb = db.Column(db.Integer)
+    color_l = db.Column(db.Float)
+    color_a = db.Column(db.Float)
+    color_b = db.Column(db.Float)
+    volume = db.Column(db.Float, index=True)
+    computed_density = db.Column(db.Float, index=True)
+    density_ratio = db.Column(db.Float, index=True)
+    aspect_ratio = db.Column(db.Float, index=True)
+    slenderness = db.Column(db.Float, index=True)
     damaged = db.Column(db.Boolean, nullable=False)
     stained = db.Column(db.Boolean, nullable=False)
     contains_metal = db.Column(db.Boolean, nullable=False, default=False)
 
+    __table_args__ = (
+        db.Index('ix_waste_wood_color_lab', 'color_l', 'color_a', 'color_b'),
+    )
+
+
+@event.listens_for(ResidualWoodModel, 'before_insert')
+@event.listens_for(ResidualWoodModel, 'before_update')
+@event.listens_for(WasteWoodModel, 'before_insert')
+@event.listens_for(WasteWoodModel, 'before_update')
+def set_derived_columns(mapper, connection, target):
+    """Parse the color string and compute the derived metrics once on write
+    so lookups never touch the raw columns again"""
+    try:
+        colors = color_columns(target.color)
+    except ValueError:
+        # Legacy rows with malformed colors keep empty color columns
+        colors = dict.fromkeys(('color_rgb', 'color_l', 'color_a', 'color_b'))
+    for key, value in colors.items():
+        setattr(target, key, value)
+    metrics = derived_columns(
+        target.length, target.width, target.height, target.weight, target.density
+    )
+    for key, value in metrics.items():
+        setattr(target, key, value)
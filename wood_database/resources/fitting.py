@@ -0,0 +1,33 @@
+"""
+__Author__ Javid Jooshesh, j.jooshesh@hva.nl
+_The API matching design parts to the wood inventory_
+"""
+
+from flask_smorest import abort, Blueprint
+from flask.views import MethodView
+from matching import match_inventory
+from schema import MatchSchema
+from snapshot import inventory
+
+
+blp = Blueprint('Fitting', 'fitting', description='Matching parts to the wood')
+
+
+@blp.route('/match')
+class Match(MethodView):
+
+    @blp.arguments(MatchSchema)
+    @blp.response(200, MatchSchema)
+    def post(self, parsed_data):
+        table = parsed_data['table']
+        if inventory.columns(table) is None:
+            abort(503, message="The inventory snapshot of %s is not available." % table)
+
+        parts = parsed_data['parts']
+        # Parts are matched by priority, the answer is keyed by part name
+        names = sorted(parts, key=lambda name: (parts[name].get('priority', float('inf')), name))
+        ids = match_inventory(
+            table,
+            tuple((parts[n]['length'], parts[n]['width'], parts[n]['height']) for n in names),
+        )
+        return {"matches": dict(zip(names, ids))}
@@ -0,0 +1,29 @@
+"""
+__Author__ Javid Jooshesh, j.jooshesh@hva.nl
+_The API computing the placement transforms of the fitted blocks_
+"""
+
+from flask_smorest import Blueprint
+from flask.views import MethodView
+from placement import placement_matrices
+from schema import PlacementSchema
+
+
+blp = Blueprint('Placement', 'placement', description='Placement of the fitted blocks')
+
+
+@blp.route('/placements')
+class Placements(MethodView):
+
+    @blp.arguments(PlacementSchema)
+    @blp.response(200, PlacementSchema)
+    def post(self, parsed_data):
+        matrices = placement_matrices(
+            parsed_data['block_indices'],
+            parsed_data['offsets'],
+            parsed_data['edge_start'],
+            parsed_data['edge_end'],
+            parsed_data.get('block_start'),
+            parsed_data.get('block_end'),
+        )
+        return {"matrices": matrices.ravel().tolist()}
@@ -5,21 +5,117 @@ _The API for the wood database and backend_
 
 from flask_smorest import abort, Blueprint
 from flask.views import MethodView
+import numpy as np
 from db import db
 from sqlalchemy.exc import SQLAlchemyError
+from color import parse_rgb, rgb_to_lab
+from geometry import box_geometry
 from models import ResidualWoodModel, WasteWoodModel
-from schema import WoodSchema, WasteWoodSchema
+from schema import (
+    WoodSchema, WasteWoodSchema, WoodQueryArgsSchema, GeometryQueryArgsSchema, BoxGeometrySchema
+)
+from snapshot import inventory
 
 
 blp = Blueprint('DataWood', 'wood', description='Operations on the wood')
 
+RANGE_COLUMNS = (
+    'length', 'width', 'height',
+    'volume', 'computed_density', 'density_ratio', 'aspect_ratio', 'slenderness',
+)
+
+
+def query_wood(model, args):
+    """Apply the range filters, sorting, nearest color ordering and field
+    projection of the list endpoints. The range bounds are inclusive unless
+    `exclusive` is set. Colors are compared in CIELAB on the precomputed
+    columns. With a projection only the requested columns are selected and
+    plain dicts are returned, which the schema dumps as is
+    """
+    query = model.query
+    if 'projection' in args:
+        unknown = [f for f in args['projection'] if not hasattr(model, f)]
+        if unknown:
+            abort(422, message="Unknown fields for %s: %s" % (model.__tablename__, ", ".join(unknown)))
+        query = query.with_entities(*[getattr(model, f) for f in args['projection']])
+
+    for column in RANGE_COLUMNS:
+        attribute = getattr(model, column)
+        if 'min_' + column in args:
+            bound = args['min_' + column]
+            query = query.filter(attribute > bound if args['exclusive'] else attribute >= bound)
+        if 'max_' + column in args:
+            bound = args['max_' + column]
+            query = query.filter(attribute < bound if args['exclusive'] else attribute <= bound)
+
+    if 'color' in args:
+        lab_l, lab_a, lab_b = rgb_to_lab(*parse_rgb(args['color']))
+        distance = (
+            (model.color_l - lab_l) * (model.color_l - lab_l)
+            + (model.color_a - lab_a) * (model.color_a - lab_a)
+            + (model.color_b - lab_b) * (model.color_b - lab_b)
+        )
+        query = query.filter(model.color_l.isnot(None))
+        if 'max_color_distance' in args:
+            d = args['max_color_distance']
+            # Bounding box on the indexed columns first, exact distance after
+            query = query.filter(
+                model.color_l.between(lab_l - d, lab_l + d),
+                model.color_a.between(lab_a - d, lab_a + d),
+                model.color_b.between(lab_b - d, lab_b + d),
+                distance <= d * d,
+            )
+        query = query.order_by(distance)
+
+    if 'sort_by' in args:
+        column = getattr(model, args['sort_by'])
+        query = query.order_by(column.desc() if args['order'] == 'desc' else column.asc())
+
+    if 'limit' in args:
+        query = query.limit(args['limit'])
+    if 'projection' in args:
+        return [row._asdict() for row in query]
+    return query.all()
+
+
+def inventory_geometry(table, args):
+    """One page of the box geometry of the planks of a table matching the
+    id and dimension filters, ordered by id. Computed from the inventory
+    snapshot without touching the database"""
+    columns = inventory.columns(table)
+    if columns is None:
+        abort(503, message="The inventory snapshot of %s is not available." % table)
+
+    selected = np.ones(len(columns['id']), dtype=bool)
+    if 'ids' in args:
+        selected &= np.isin(columns['id'], args['ids'])
+    for column in ('length', 'width', 'height'):
+        if 'min_' + column in args:
+            selected &= columns[column] >= args['min_' + column]
+        if 'max_' + column in args:
+            selected &= columns[column] <= args['max_' + column]
+
+    rows = np.flatnonzero(selected)
+    rows = rows[np.argsort(columns['id'][rows])]
+    page = rows[args['offset']:args['offset'] + args['limit']]
+    vertices, edges = box_geometry(
+        columns['length'][page], columns['width'][page], columns['height'][page]
+    )
+    return {
+        "total": len(rows),
+        "ids": columns['id'][page].astype(np.int64).tolist(),
+        "vertices": vertices.ravel().tolist(),
+        "edges": edges.ravel().tolist(),
+    }
+
 
 @blp.route('/residual_wood')
 class ResidualWoodList(MethodView):
 
+    @blp.arguments(WoodQueryArgsSchema, location='query')
     @blp.response(200, WoodSchema(many=True))
-    def get(self):
-        wood = ResidualWoodModel.query.all()
+    def get(self, args):
+        wood = query_wood(ResidualWoodModel, args)
         return wood
 
     @blp.arguments(WoodSchema)
@@ -31,6 +127,7 @@ class ResidualWoodList(MethodView):
             db.session.commit()
         except SQLAlchemyError as e:
             abort(500, message=str(e))
+        inventory.add(wood)
         return wood
 
 
@@ -47,17 +144,28 @@ class ResidualWood(MethodView):
         wood = ResidualWoodModel.query.get_or_404(wood_id)
         db.session.delete(wood)
         db.session.commit()
+        inventory.remove(wood.__tablename__, wood_id)
         return {
             "message": "wood deleted from database."
         }
 
 
+@blp.route('/residual_wood/geometry')
+class ResidualWoodGeometry(MethodView):
+
+    @blp.arguments(GeometryQueryArgsSchema, location='query')
+    @blp.response(200, BoxGeometrySchema)
+    def get(self, args):
+        return inventory_geometry(ResidualWoodModel.__tablename__, args)
+
+
 @blp.route('/waste_wood')
 class WasteWoodList(MethodView):
 
+    @blp.arguments(WoodQueryArgsSchema, location='query')
     @blp.response(200, WasteWoodSchema(many=True))
-    def get(self):
-        wood = WasteWoodModel.query.all()
+    def get(self, args):
+        wood = query_wood(WasteWoodModel, args)
         return wood
 
     @blp.arguments(WasteWoodSchema)
@@ -69,6 +177,7 @@ class WasteWoodList(MethodView):
             db.session.commit()
         except SQLAlchemyError as e:
             abort(500, message=str(e))
+        inventory.add(wood)
         return wood
 
 
@@ -85,6 +194,16 @@ class WasteWood(MethodView):
         wood = WasteWoodModel.query.get_or_404(wood_id)
         db.session.delete(wood)
         db.session.commit()
+        inventory.remove(wood.__tablename__, wood_id)
         return {
             "message": "wood deleted from database."
         }
+
+
+@blp.route('/waste_wood/geometry')
+class WasteWoodGeometry(MethodView):
+
+    @blp.arguments(GeometryQueryArgsSchema, location='query')
+    @blp.response(200, BoxGeometrySchema)
+    def get(self, args):
+        return inventory_geometry(WasteWoodModel.__tablename__, args)
@@ -3,7 +3,17 @@ __Author__ Javid Jooshesh, j.jooshesh@hva.nl
 _Database schema for data validation_
 """
 
-from marshmallow import fields, Schema
+from marshmallow import fields, Schema, validate, validates_schema, ValidationError
+from webargs.fields import DelimitedList
+
+from color import parse_rgb
+
+
+def validate_color(value):
+    try:
+        parse_rgb(value)
+    except ValueError as e:
+        raise ValidationError(str(e))
 
 
 class WoodSchema(Schema):
@@ -14,7 +24,12 @@ class WoodSchema(Schema):
     weight = fields.Float(required=True)
     density = fields.Float(required=True)
     timestamp = fields.Str(required=True)
-    color = fields.Str(required=True)
+    color = fields.Str(required=True, validate=validate_color)
+    volume = fields.Float(dump_only=True)
+    computed_density = fields.Float(dump_only=True)
+    density_ratio = fields.Float(dump_only=True)
+    aspect_ratio = fields.Float(dump_only=True)
+    slenderness = fields.Float(dump_only=True)
 
 
 class WasteWoodSchema(WoodSchema):
@@ -22,3 +37,115 @@ class WasteWoodSchema(WoodSchema):
     damaged = fields.Bool(required=True)
     stained = fields.Bool(required=True)
 
+
+SORT_COLUMNS = (
+    'id', 'length', 'width', 'height', 'weight', 'density',
+    'volume', 'computed_density', 'density_ratio', 'aspect_ratio', 'slenderness',
+)
+
+PROJECTION_COLUMNS = SORT_COLUMNS + (
+    'timestamp', 'color', 'contains_metal', 'damaged', 'stained',
+)
+
+
+class WoodQueryArgsSchema(Schema):
+    # The min_/max_ bounds are inclusive unless `exclusive` is set, which
+    # makes all of them strict, e.g. 1 < aspect_ratio < 4
+    color = fields.Str(validate=validate_color)
+    max_color_distance = fields.Float(validate=validate.Range(min=0))
+    limit = fields.Int(validate=validate.Range(min=1))
+    min_length = fields.Float()
+    max_length = fields.Float()
+    min_width = fields.Float()
+    max_width = fields.Float()
+    min_height = fields.Float()
+    max_height = fields.Float()
+    min_volume = fields.Float()
+    max_volume = fields.Float()
+    min_computed_density = fields.Float()
+    max_computed_density = fields.Float()
+    min_density_ratio = fields.Float()
+    max_density_ratio = fields.Float()
+    min_aspect_ratio = fields.Float()
+    max_aspect_ratio = fields.Float()
+    min_slenderness = fields.Float()
+    max_slenderness = fields.Float()
+    exclusive = fields.Bool(load_default=False)
+    sort_by = fields.Str(validate=validate.OneOf(SORT_COLUMNS))
+    order = fields.Str(load_default='asc', validate=validate.OneOf(('asc', 'desc')))
+    projection = DelimitedList(
+        fields.Str(validate=validate.OneOf(PROJECTION_COLUMNS)),
+        data_key='fields',
+    )
+
+    @validates_schema
+    def validate_color_distance(self, data, **kwargs):
+        if 'max_color_distance' in data and 'color' not in data:
+            raise ValidationError("max_color_distance requires color", 'max_color_distance')
+
+
+class GeometryQueryArgsSchema(Schema):
+    ids = DelimitedList(fields.Int())
+    min_length = fields.Float()
+    max_length = fields.Float()
+    min_width = fields.Float()
+    max_width = fields.Float()
+    min_height = fields.Float()
+    max_height = fields.Float()
+    limit = fields.Int(load_default=1000, validate=validate.Range(min=1, max=10000))
+    offset = fields.Int(load_default=0, validate=validate.Range(min=0))
+
+
+class BoxGeometrySchema(Schema):
+    """One page of flat per-plank arrays, the rows of plank `i` start at
+    `i * stride`. Edge lengths are left out, they are the plank dimensions
+    four times each"""
+    total = fields.Int(dump_only=True, metadata={"description": "Planks matching the filters over all pages"})
+    ids = fields.List(fields.Int(), dump_only=True)
+    vertices = fields.Raw(dump_only=True, metadata={"description": "8 corners x 3 coordinates per plank"})
+    edges = fields.Raw(dump_only=True, metadata={"description": "12 edges x 2 points x 3 coordinates per plank"})
+
+
+class PlacementSchema(Schema):
+    block_indices = fields.List(fields.Int(validate=validate.Range(min=0)), required=True, load_only=True)
+    offsets = fields.List(fields.Float(), required=True, load_only=True)
+    edge_start = fields.List(fields.Float(), required=True, load_only=True, validate=validate.Length(equal=3))
+    edge_end = fields.List(fields.Float(), required=True, load_only=True, validate=validate.Length(equal=3))
+    block_start = fields.List(fields.List(fields.Float(), validate=validate.Length(equal=3)), load_only=True)
+    block_end = fields.List(fields.List(fields.Float(), validate=validate.Length(equal=3)), load_only=True)
+    matrices = fields.Raw(dump_only=True, metadata={"description": "Row-major 4x4 matrix per placement"})
+
+    @validates_schema
+    def validate_lengths(self, data, **kwargs):
+        if len(data['block_indices']) != len(data['offsets']):
+            raise ValidationError("block_indices and offsets must have the same length")
+        if data['edge_start'] == data['edge_end']:
+            raise ValidationError("edge_start and edge_end must differ")
+        if ('block_start' in data) != ('block_end' in data):
+            raise ValidationError("block_start and block_end must be given together")
+        if 'block_start' in data:
+            blocks = len(data['block_start'])
+            if len(data['block_end']) != blocks:
+                raise ValidationError("block_start and block_end must have the same length")
+            if any(i >= blocks for i in data['block_indices']):
+                raise ValidationError("block_indices must index block_start and block_end")
+            if any(start == end for start, end in zip(data['block_start'], data['block_end'])):
+                raise ValidationError("block_start and block_end must differ for every block")
+
+
+class PartSchema(Schema):
+    length = fields.Float(required=True, validate=validate.Range(min=0))
+    width = fields.Float(required=True, validate=validate.Range(min=0))
+    height = fields.Float(required=True, validate=validate.Range(min=0))
+    priority = fields.Int()
+
+
+class MatchSchema(Schema):
+    """A design request in the form of `example.json`, matched against the
+    residual wood unless `table` says otherwise"""
+    name = fields.Str(load_only=True)
+    table = fields.Str(load_only=True, load_default='residual_wood',
+                       validate=validate.OneOf(('residual_wood', 'waste_wood')))
+    parts = fields.Dict(keys=fields.Str(), values=fields.Nested(PartSchema),
+                        required=True, load_only=True)
+    matches = fields.Dict(keys=fields.Str(), values=fields.Int(allow_none=True), dump_only=True)
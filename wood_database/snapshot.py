@@ -0,0 +1,243 @@
+"""
+__Author__ Javid Jooshesh, j.jooshesh@hva.nl
+_Memory-mapped columnar snapshot of the wood dimensions shared by all the
+app workers_
+"""
+
+import fcntl
+import hashlib
+import os
+import time
+from contextlib import contextmanager
+
+import numpy as np
+from numpy.lib.format import open_memmap
+from sqlalchemy import func, select
+
+from db import db
+from models import ResidualWoodModel, WasteWoodModel
+
+MODELS = {model.__tablename__: model for model in (ResidualWoodModel, WasteWoodModel)}
+COLUMNS = ('id', 'length', 'width', 'height')
+MIN_CAPACITY = 1024
+
+# Slots of the small header array kept next to every table file
+COUNT, GENERATION, VERSION = 0, 1, 2
+
+
+class InventorySnapshot:
+    """_Columnar copy of the dimension columns of the wood tables_
+
+    Every table is stored as a `(len(COLUMNS), capacity)` float64 `.npy` file
+    so each column is contiguous, plus a header holding the row count, the
+    file generation and a version bumped on every write. Writers take a file
+    lock, readers map the files read-only and get zero-copy NumPy views.
+    Deleted rows are swapped with the last row, so the views are unordered.
+
+    Writes made outside the app are caught by comparing a fingerprint of the
+    table with one of the snapshot, at most every
+    `INVENTORY_SNAPSHOT_CHECK_INTERVAL` seconds per worker.
+    """
+
+    def __init__(self, app=None):
+        self.path = None
+        self.check_interval = 10.0
+        self._headers = {}
+        self._data = {}
+        self._checked = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        # One directory per database so two databases never share files
+        database = hashlib.sha1(app.config['SQLALCHEMY_DATABASE_URI'].encode()).hexdigest()[:16]
+        self.path = app.config.get(
+            'INVENTORY_SNAPSHOT_PATH', os.path.join(app.instance_path, 'snapshot', database)
+        )
+        self.check_interval = app.config.get('INVENTORY_SNAPSHOT_CHECK_INTERVAL', 10.0)
+        os.makedirs(self.path, exist_ok=True)
+        app.extensions['inventory_snapshot'] = self
+
+    def _file(self, table, suffix):
+        return os.path.join(self.path, '%s.%s' % (table, suffix))
+
+    @contextmanager
+    def _lock(self, table):
+        with open(self._file(table, 'lock'), 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _missing(self, table):
+        """Tell whether the files of a table are gone, e.g. the snapshot
+        directory was cleared, dropping the stale mappings if so"""
+        if os.path.exists(self._file(table, 'header.npy')):
+            return False
+        self._headers.pop(table, None)
+        self._data.pop((table, 'r'), None)
+        self._data.pop((table, 'r+'), None)
+        return True
+
+    def _header(self, table):
+        if table not in self._headers:
+            header_file = self._file(table, 'header.npy')
+            if not os.path.exists(header_file):
+                return None
+            self._headers[table] = open_memmap(header_file, mode='r+')
+        return self._headers[table]
+
+    def _array(self, table, mode='r'):
+        """Return the mapped table file, remapping it when another worker
+        has replaced it since it was last opened"""
+        header = self._header(table)
+        generation = int(header[GENERATION])
+        cached = self._data.get((table, mode))
+        if cached is None or cached[0] != generation:
+            cached = (generation, open_memmap(self._file(table, 'npy'), mode=mode))
+            self._data[(table, mode)] = cached
+        return cached[1]
+
+    def _write(self, table, rows, capacity):
+        """Write `rows` into a new table file and swap it in atomically"""
+        tmp_file = self._file(table, 'tmp.npy')
+        array = open_memmap(tmp_file, mode='w+', dtype=np.float64,
+                            shape=(len(COLUMNS), capacity))
+        array[:, :rows.shape[1]] = rows
+        array.flush()
+        del array
+        os.replace(tmp_file, self._file(table, 'npy'))
+
+        header = self._header(table)
+        if header is None:
+            header = open_memmap(self._file(table, 'header.npy'), mode='w+',
+                                 dtype=np.int64, shape=(3,))
+            # Start from the clock so a recreated snapshot never reuses the
+            # versions of the one it replaces
+            header[VERSION] = time.time_ns()
+            self._headers[table] = header
+        header[COUNT] = rows.shape[1]
+        header[GENERATION] += 1
+        header[VERSION] += 1
+        header.flush()
+
+    def rebuild(self, table):
+        """Reload a table from the database into a fresh snapshot file
+
+        The rows are read under the lock on a fresh connection, so a
+        concurrent `add` either lands in the read or runs after the swap
+        """
+        model = MODELS[table]
+        query = select(*[getattr(model, c) for c in COLUMNS])
+        os.makedirs(self.path, exist_ok=True)
+        with self._lock(table):
+            with db.engine.connect() as connection:
+                rows = connection.execute(query).fetchall()
+            data = np.array(rows, dtype=np.float64).reshape(-1, len(COLUMNS)).T
+            self._write(table, data, max(MIN_CAPACITY, 2 * data.shape[1]))
+
+    @staticmethod
+    def _database_fingerprint(table):
+        model = MODELS[table]
+        row = db.session.query(
+            func.count(model.id), func.max(model.id), func.sum(model.id),
+            func.sum(model.length), func.sum(model.width), func.sum(model.height),
+        ).one()
+        return [value or 0 for value in row]
+
+    def _snapshot_fingerprint(self, table):
+        header = self._header(table)
+        array = self._array(table)[:, :int(header[COUNT])]
+        ids = array[0]
+        return [
+            len(ids), ids.max() if len(ids) else 0, ids.sum(),
+            array[1].sum(), array[2].sum(), array[3].sum(),
+        ]
+
+    def refresh(self, table, force=False):
+        """Rebuild a table snapshot when it is missing or its fingerprint (row
+        count, max and sum of the ids, sums of the dimensions) no longer
+        matches the database, as after a migration, a manual import or an
+        update made outside the app. Checks are throttled unless forced"""
+        if self._missing(table):
+            self.rebuild(table)
+            return
+        now = time.monotonic()
+        if not force and now - self._checked.get(table, float('-inf')) < self.check_interval:
+            return
+        self._checked[table] = now
+        if self._header(table) is None or not np.allclose(
+            self._snapshot_fingerprint(table), self._database_fingerprint(table),
+            rtol=1e-9, atol=1e-6,
+        ):
+            self.rebuild(table)
+
+    def sync(self):
+        """Check every table against the database, run on startup"""
+        for table in MODELS:
+            self.refresh(table, force=True)
+
+    def add(self, wood):
+        """Append a committed wood model to the snapshot"""
+        table = wood.__tablename__
+        if self._missing(table):
+            # The committed row is picked up by the rebuild
+            self.rebuild(table)
+            return
+        row = [getattr(wood, c) for c in COLUMNS]
+        with self._lock(table):
+            header = self._header(table)
+            array = self._array(table, mode='r+')
+            count = int(header[COUNT])
+            # A rebuild that ran after the commit already holds the row
+            if np.any(array[0, :count] == wood.id):
+                return
+            if count == array.shape[1]:
+                self._write(table, array[:, :count], 2 * array.shape[1])
+                array = self._array(table, mode='r+')
+            array[:, count] = row
+            array.flush()
+            header[COUNT] = count + 1
+            header[VERSION] += 1
+            header.flush()
+
+    def remove(self, table, wood_id):
+        """Drop a deleted row by moving the last row into its slot"""
+        if self._missing(table):
+            self.rebuild(table)
+            return
+        with self._lock(table):
+            header = self._header(table)
+            array = self._array(table, mode='r+')
+            count = int(header[COUNT])
+            found = np.flatnonzero(array[0, :count] == wood_id)
+            if not len(found):
+                return
+            array[:, found[0]] = array[:, count - 1]
+            array.flush()
+            header[COUNT] = count - 1
+            header[VERSION] += 1
+            header.flush()
+
+    def version(self, table):
+        """Return a counter that changes whenever the table snapshot does"""
+        self.refresh(table)
+        header = self._header(table)
+        if header is None:
+            return None
+        return int(header[VERSION])
+
+    def columns(self, table):
+        """Return read-only zero-copy views of the snapshot columns, keyed by
+        column name. Copy them when a consistent view across writes matters"""
+        self.refresh(table)
+        header = self._header(table)
+        if header is None:
+            return None
+        array = self._array(table)
+        count = int(header[COUNT])
+        return {name: array[i, :count] for i, name in enumerate(COLUMNS)}
+
+
+inventory = InventorySnapshot()
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from placement import placement_matrices
+
+
+def apply(matrix, point):
+    return (matrix @ np.append(point, 1.0))[:3]
+
+
+def test_block_edge_is_moved_onto_target_edge_at_offset():
+    block_start = [[5.0, 5.0, 0.0], [1.0, 2.0, 3.0]]
+    block_end = [[5.0, 15.0, 0.0], [8.0, 2.0, 3.0]]
+
+    matrices = placement_matrices([1, 0], [7.0, 2.0], [0, 0, 0], [10, 0, 0], block_start, block_end)
+
+    np.testing.assert_allclose(apply(matrices[0], block_start[1]), [7, 0, 0], atol=1e-12)
+    np.testing.assert_allclose(apply(matrices[0], block_end[1]), [14, 0, 0], atol=1e-12)
+    np.testing.assert_allclose(apply(matrices[1], block_start[0]), [2, 0, 0], atol=1e-12)
+    np.testing.assert_allclose(apply(matrices[1], block_end[0]), [12, 0, 0], atol=1e-12)
+    for matrix in matrices:
+        np.testing.assert_allclose(matrix[:3, :3] @ matrix[:3, :3].T, np.eye(3), atol=1e-12)
+        assert np.linalg.det(matrix[:3, :3]) == pytest.approx(1.0)
+
+
+def test_default_blocks_keep_their_height_upwards():
+    matrices = placement_matrices([0, 0], [1.0, 3.0], [0, 0, 0], [0, 1, 0])
+
+    np.testing.assert_allclose(apply(matrices[1], [0, 0, 0]), [0, 3, 0], atol=1e-12)
+    np.testing.assert_allclose(apply(matrices[1], [1, 0, 0]), [0, 4, 0], atol=1e-12)
+    np.testing.assert_allclose(matrices[1][:3, 2], [0, 0, 1], atol=1e-12)
+
+
+def test_zero_length_target_edge_is_rejected():
+    with pytest.raises(ValueError):
+        placement_matrices([0], [1.0], [1, 1, 1], [1, 1, 1])
+
+
+def test_zero_length_block_edge_is_rejected():
+    with pytest.raises(ValueError):
+        placement_matrices([0], [1.0], [0, 0, 0], [1, 0, 0], [[2, 2, 2]], [[2, 2, 2]])